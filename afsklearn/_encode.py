@@ -45,6 +45,101 @@ def _encode(values, *, uniques, check_unknown=True):
         return np.searchsorted(uniques, values)
 
 
+def _encode_with_mask(values, *, uniques, table=None):
+    """Helper function to encode values and flag the unknown ones at once.
+    Equivalent to ``_check_unknown(values, uniques, return_mask=True)``
+    followed by ``_encode(values[valid_mask], uniques=uniques,
+    check_unknown=False)``, but `values` is traversed only once.
+    Parameters
+    ----------
+    values : ndarray
+        Values to encode.
+    uniques : ndarray
+        The unique values to encode against. If the dtype is not object,
+        then `uniques` needs to be sorted.
+    table : dict, default=None
+        The mapping of `uniques` to their positions, as built by
+        `_map_table`, for object dtype. Built on the fly if None.
+    Returns
+    -------
+    encoded : ndarray
+        Encoded values. Unknown values are encoded as 0.
+    valid_mask : boolean ndarray
+        True where the value is one of `uniques`.
+    """
+    if values.dtype.kind in 'OUS':
+        if table is None:
+            table = _map_table(uniques)
+        encoded = np.empty(len(values), dtype=np.intp)
+        for j, value in enumerate(values):
+            try:
+                encoded[j] = table[value]
+            except KeyError:
+                encoded[j] = -1
+        valid_mask = encoded >= 0
+        encoded[~valid_mask] = 0
+        return encoded, valid_mask
+
+    if not len(uniques):
+        return (np.zeros(len(values), dtype=np.intp),
+                np.zeros(len(values), dtype=bool))
+    encoded = np.minimum(np.searchsorted(uniques, values), len(uniques) - 1)
+    found = uniques[encoded]
+    valid_mask = found == values
+    if found.dtype.kind == 'f' and values.dtype.kind == 'f':
+        # nan is sorted last, so a nan value lands on a nan category
+        valid_mask |= np.isnan(found) & np.isnan(values)
+    encoded[~valid_mask] = 0
+    return encoded, valid_mask
+
+
+def _encode_columns(values, *, uniques, offsets):
+    """Helper function to encode several numerical columns at once.
+    Equivalent to calling `_encode_with_mask` on every column against its
+    own categories: every column is searched in its slice of `uniques`,
+    then the found categories are checked for all the columns at once.
+    Parameters
+    ----------
+    values : list of ndarray
+        Numerical columns to encode, all of the same length.
+    uniques : ndarray
+        The sorted unique values of every column, concatenated.
+    offsets : ndarray of shape (n_columns + 1,)
+        ``uniques[offsets[i]:offsets[i + 1]]`` holds the unique values of
+        the ith column.
+    Returns
+    -------
+    encoded : ndarray of shape (n_samples, n_columns)
+        Encoded values. Unknown values are encoded as 0.
+    valid_mask : boolean ndarray of shape (n_samples, n_columns)
+        True where the value is one of the unique values of its column.
+    """
+    # the columns are laid out as rows, so that each one is written and
+    # searched contiguously, and transposed on return
+    n_columns = len(values)
+    encoded = np.empty((n_columns, len(values[0])), dtype=np.intp)
+    if not len(uniques):
+        encoded[:] = 0
+        return encoded.T, np.zeros(encoded.shape, dtype=bool).T
+
+    X = np.empty(encoded.shape, dtype=np.result_type(*values))
+    for i, Xi in enumerate(values):
+        X[i] = Xi
+        encoded[i] = np.searchsorted(uniques[offsets[i]:offsets[i + 1]],
+                                     X[i])
+    # values past the last category of their column are unknown, the
+    # others are compared to the category they landed on
+    valid_mask = encoded < np.diff(offsets)[:, None]
+    found = uniques[np.minimum(encoded + offsets[:-1, None],
+                               len(uniques) - 1)]
+    valid_mask &= found == X
+    if found.dtype.kind == 'f' and X.dtype.kind == 'f':
+        # nan is sorted last, so a nan value lands on a nan category
+        valid_mask |= np.isnan(found) & np.isnan(X)
+    encoded[~valid_mask] = 0
+    return encoded.T, valid_mask.T
+
+
 def _unique(values, *, return_inverse=False):
     """Helper function to find unique values with support for python objects.
     Uses pure python method for object dtype, and numpy method for
@@ -107,9 +202,14 @@ def _unique_python(values, *, return_inverse):
     return uniques
 
 
+def _map_table(uniques):
+    """Build the table mapping every unique value to its position."""
+    return _nandict({val: i for i, val in enumerate(uniques)})
+
+
 def _map_to_integer(values, uniques):
     """Map values based on its position in uniques."""
-    table = _nandict({val: i for i, val in enumerate(uniques)})
+    table = _map_table(uniques)
     return np.array([table[v] for v in values])
 
 
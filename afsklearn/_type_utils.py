@@ -62,7 +62,7 @@ def typemap(dtype):
                       arrayfire.u64.value: numpy.dtype('uint64'),
                       arrayfire.b8.value: numpy.dtype('bool'),
                       }
-        TypeMap = {numpy.dtype('float32'): arrayfire.f16.value,
+        TypeMap = {numpy.dtype('float16'): arrayfire.f16.value,
                    numpy.dtype('float32'): arrayfire.f32.value,
                    numpy.dtype('float64'): arrayfire.f64.value,
                    numpy.dtype('uint8'): arrayfire.u8.value,
@@ -2,8 +2,9 @@ import numpy as np  # FIXME
 from scipy import sparse
 from sklearn.utils.validation import _deprecate_positional_args
 
-from .._encode import _check_unknown, _encode, _unique
-from .._validation import check_array, check_is_fitted, is_scalar_nan
+from .._encode import (_check_unknown, _encode_columns, _encode_with_mask,
+                       _map_table, _unique)
+from .._validation import _object_dtype_isnan, check_array, check_is_fitted
 from ..base import afBaseEstimator, afTransformerMixin
 
 
@@ -61,43 +62,75 @@ class _BaseEncoder(afTransformerMixin, afBaseEstimator):
     def _fit(self, X, handle_unknown='error', force_all_finite=True):
         X_list, n_samples, n_features = self._check_X(
             X, force_all_finite=force_all_finite)
+        self._fit_list(X_list, n_samples, n_features,
+                       handle_unknown=handle_unknown)
 
+    def _fit_list(self, X_list, n_samples, n_features, handle_unknown='error'):
+        """Fit the categories on the feature list returned by `_check_X`."""
         if self.categories != 'auto':
             if len(self.categories) != n_features:
                 raise ValueError("Shape mismatch: if categories is an array,"
                                  " it has to be of shape (n_features,).")
 
-        self.categories_ = []
-
-        for i in range(n_features):
-            Xi = X_list[i]
-            if self.categories == 'auto':
-                cats = _unique(Xi)
-            else:
-                cats = np.array(self.categories[i], dtype=Xi.dtype)
-                if Xi.dtype.kind not in 'OUS':
-                    sorted_cats = np.sort(cats)
-                    error_msg = ("Unsorted categories are not "
-                                 "supported for numerical categories")
-                    # if there are nans, nan should be the last element
-                    stop_idx = -1 if np.isnan(sorted_cats[-1]) else None
-                    if (np.any(sorted_cats[:stop_idx] != cats[:stop_idx]) or
-                        (np.isnan(sorted_cats[-1]) and
-                         not np.isnan(sorted_cats[-1]))):
-                        raise ValueError(error_msg)
-
-                if handle_unknown == 'error':
-                    diff = _check_unknown(Xi, cats)
-                    if diff:
-                        msg = ("Found unknown categories {0} in column {1}"
-                               " during fit".format(diff, i))
-                        raise ValueError(msg)
-            self.categories_.append(cats)
+        self.categories_ = [self._fit_column(X_list[i], i, handle_unknown)
+                            for i in range(n_features)]
+
+        # the lookup tables of non-numerical categories are built once here
+        # rather than on every transform
+        self._category_tables_ = [
+            _map_table(cats) if cats.dtype.kind in 'OUS' else None
+            for cats in self.categories_]
+        # Numerical categories sharing a dtype are also kept as one flat
+        # array with per-feature offsets: a list of (features, flat
+        # categories, offsets) tuples, one per dtype.
+        groups = {}
+        for i, cats in enumerate(self.categories_):
+            if cats.dtype.kind in 'biuf':
+                groups.setdefault(cats.dtype, []).append(i)
+        self._cats_flat_ = []
+        for columns in groups.values():
+            cats = [self.categories_[i] for i in columns]
+            self._cats_flat_.append((
+                columns, np.concatenate(cats),
+                np.cumsum([0] + [len(c) for c in cats])))
+        # dtype of the inverse transformed array
+        self._out_dtype_ = np.find_common_type(
+            [cats.dtype for cats in self.categories_], [])
+
+    def _fit_column(self, Xi, i, handle_unknown='error'):
+        """Find or check the categories of the ith feature."""
+        if self.categories == 'auto':
+            return _unique(Xi)
+
+        cats = np.array(self.categories[i], dtype=Xi.dtype)
+        if Xi.dtype.kind not in 'OUS' and cats.size:
+            error_msg = ("Unsorted categories are not "
+                         "supported for numerical categories")
+            # if there are nans, nan should be the last element
+            is_nan = np.isnan(cats)
+            stop_idx = -1 if is_nan[-1] else None
+            # a single pass over neighbours checks the order, no sort needed
+            head = cats[:stop_idx]
+            if np.any(is_nan[:stop_idx]) or np.any(head[1:] < head[:-1]):
+                raise ValueError(error_msg)
+
+        if handle_unknown == 'error':
+            diff = _check_unknown(Xi, cats)
+            if diff:
+                msg = ("Found unknown categories {0} in column {1}"
+                       " during fit".format(diff, i))
+                raise ValueError(msg)
+        return cats
 
     def _transform(self, X, handle_unknown='error', force_all_finite=True):
         X_list, n_samples, n_features = self._check_X(
             X, force_all_finite=force_all_finite)
+        return self._transform_list(X_list, n_samples, n_features,
+                                    handle_unknown=handle_unknown)
 
+    def _transform_list(self, X_list, n_samples, n_features,
+                        handle_unknown='error'):
+        """Encode the feature list returned by `_check_X`."""
         X_int = np.zeros((n_samples, n_features), dtype=int)
         X_mask = np.ones((n_samples, n_features), dtype=bool)
 
@@ -109,43 +142,55 @@ class _BaseEncoder(afTransformerMixin, afBaseEstimator):
                 .format(len(self.categories_,), n_features)
             )
 
+        # numerical columns sharing a categories dtype are encoded together
+        # against the flat categories stored by `_fit_list`
+        encoded = set()
+        for columns, cats_flat, offsets in self._cats_flat_:
+            if any(X_list[i].dtype.kind not in 'biuf' for i in columns):
+                continue
+            X_int[:, columns], X_mask[:, columns] = _encode_columns(
+                [X_list[i] for i in columns], uniques=cats_flat,
+                offsets=offsets)
+            encoded.update(columns)
+
         for i in range(n_features):
-            Xi = X_list[i]
-            diff, valid_mask = _check_unknown(Xi, self.categories_[i],
-                                              return_mask=True)
-
-            if not np.all(valid_mask):
-                if handle_unknown == 'error':
-                    msg = ("Found unknown categories {0} in column {1}"
-                           " during transform".format(diff, i))
-                    raise ValueError(msg)
-                else:
-                    # Set the problematic rows to an acceptable value and
-                    # continue `The rows are marked `X_mask` and will be
-                    # removed later.
-                    X_mask[:, i] = valid_mask
-                    # cast Xi into the largest string type necessary
-                    # to handle different lengths of numpy strings
-                    if (self.categories_[i].dtype.kind in ('U', 'S')
-                            and self.categories_[i].itemsize > Xi.itemsize):
-                        Xi = Xi.astype(self.categories_[i].dtype)
-                    elif (self.categories_[i].dtype.kind == 'O' and
-                            Xi.dtype.kind == 'U'):
-                        # categories are objects and Xi are numpy strings.
-                        # Cast Xi to an object dtype to prevent truncation
-                        # when setting invalid values.
-                        Xi = Xi.astype('O')
-                    else:
-                        Xi = Xi.copy()
-
-                    Xi[~valid_mask] = self.categories_[i][0]
-            # We use check_unknown=False, since _check_unknown was
-            # already called above.
-            X_int[:, i] = _encode(Xi, uniques=self.categories_[i],
-                                  check_unknown=False)
+            if i in encoded:
+                continue
+            Xi_int, valid_mask = self._transform_column(X_list[i], i,
+                                                        handle_unknown)
+            if Xi_int is not None:
+                X_int[:, i] = Xi_int
+            if valid_mask is not None:
+                # The rows are marked `X_mask`: they are removed later, or
+                # reported below when handle_unknown='error'.
+                X_mask[:, i] = valid_mask
+
+        if handle_unknown == 'error' and not np.all(X_mask):
+            # report the first column holding unknown categories
+            i = np.flatnonzero(~np.all(X_mask, axis=0))[0]
+            diff = _check_unknown(X_list[i], self.categories_[i])
+            msg = ("Found unknown categories {0} in column {1}"
+                   " during transform".format(diff, i))
+            raise ValueError(msg)
 
         return X_int, X_mask
 
+    def _transform_column(self, Xi, i, handle_unknown='error'):
+        """Encode the ith feature.
+        Returns the encoded column, None if it holds unknown categories and
+        handle_unknown='error', and the mask of its known values, None if
+        they all are.
+        """
+        cats = self.categories_[i]
+        table = self._category_tables_[i]
+        Xi_int, valid_mask = _encode_with_mask(Xi, uniques=cats, table=table)
+
+        if np.all(valid_mask):
+            valid_mask = None
+        elif handle_unknown == 'error':
+            return None, valid_mask
+        return Xi_int, valid_mask
+
     def _more_tags(self):
         return {'X_types': ['categorical']}
 
@@ -328,25 +373,29 @@ class OneHotEncoder(_BaseEncoder):
                 msg = ("`drop` should have length equal to the number "
                        "of features ({}), got {}")
                 raise ValueError(msg.format(len(self.categories_), droplen))
-            missing_drops = []
-            drop_indices = []
-            for col_idx, (val, cat_list) in enumerate(zip(drop_array,
-                                                          self.categories_)):
-                if not is_scalar_nan(val):
-                    drop_idx = np.where(cat_list == val)[0]
-                    if drop_idx.size:  # found drop idx
-                        drop_indices.append(drop_idx[0])
-                    else:
-                        missing_drops.append((col_idx, val))
-                    continue
-
-                # val is nan, find nan in categories manually
-                for cat_idx, cat in enumerate(cat_list):
-                    if is_scalar_nan(cat):
-                        drop_indices.append(cat_idx)
-                        break
-                else:  # loop did not break thus drop is missing
-                    missing_drops.append((col_idx, val))
+            # search all the features at once: every category is paired with
+            # the value to drop from its feature
+            n_cats = np.array([len(cats) for cats in self.categories_])
+            cats_flat = np.concatenate(
+                [np.asarray(cats, dtype=object) for cats in self.categories_])
+            drop_flat = np.repeat(drop_array, n_cats)
+            match = cats_flat == drop_flat
+            drop_is_nan = _object_dtype_isnan(drop_array)
+            if drop_is_nan.any():
+                # nan never equals itself, it is only searched for in the
+                # features where it is the value to drop
+                match |= (_object_dtype_isnan(cats_flat) &
+                          np.repeat(drop_is_nan, n_cats))
+
+            hits = np.flatnonzero(match)
+            col_ids = np.repeat(np.arange(droplen), n_cats)[hits]
+            found_cols, first_hit = np.unique(col_ids, return_index=True)
+            offsets = np.cumsum(n_cats) - n_cats
+            drop_indices = hits[first_hit] - offsets[found_cols]
+
+            missing_cols = np.setdiff1d(np.arange(droplen), found_cols)
+            missing_drops = [(col_idx, drop_array[col_idx])
+                             for col_idx in missing_cols]
 
             if any(missing_drops):
                 msg = ("The following categories were supposed to be "
@@ -358,6 +407,53 @@ class OneHotEncoder(_BaseEncoder):
                 raise ValueError(msg)
             return np.array(drop_indices, dtype=object)
 
+    def _compute_output_layout(self):
+        """Precompute the data-independent layout of the encoded output."""
+        self._cats_minus_drop_ = []
+        for i, cats in enumerate(self.categories_):
+            if self.drop_idx_ is None or self.drop_idx_[i] is None:
+                self._cats_minus_drop_.append(cats)
+            else:
+                self._cats_minus_drop_.append(np.delete(cats,
+                                                        self.drop_idx_[i]))
+        n_values = [len(cats) for cats in self._cats_minus_drop_]
+        self._n_transformed_features_ = sum(n_values)
+        # first output column of every feature, and the total width last
+        self._feature_indices_ = np.cumsum([0] + n_values)
+
+        # the dropped category of every feature as an integer row, set to
+        # the cardinality when drop='if_binary' and the feature isn't binary
+        # so that nothing is dropped from it
+        self._to_drop_ = None
+        if self.drop_idx_ is not None:
+            self._to_drop_ = np.array(
+                [len(cats) if to_drop is None else to_drop
+                 for cats, to_drop in zip(self.categories_, self.drop_idx_)],
+                dtype=int).reshape(1, -1)
+
+        # Integer categories spanning a small range are encoded by a direct
+        # lookup: `lut[lut_offsets[i] + x - mins[i]]` is the code of the value
+        # x of the ith feature, or -1 if x is not a category. The table is
+        # only built when it is not much larger than the categories, and
+        # not for duplicated user categories, which the lookup would encode
+        # to their last occurrence instead of their first.
+        self._int_lut_ = None
+        if all(cats.dtype.kind in 'iu' and np.can_cast(cats.dtype, np.int64)
+               and cats.size and not np.any(cats[1:] == cats[:-1])
+               for cats in self.categories_):
+            mins = np.array([cats[0] for cats in self.categories_],
+                            dtype=np.int64)
+            maxs = np.array([cats[-1] for cats in self.categories_],
+                            dtype=np.int64)
+            spans = maxs - mins + 1
+            n_categories = sum(len(cats) for cats in self.categories_)
+            if spans.sum() <= max(4 * n_categories, 2 ** 16):
+                lut_offsets = np.cumsum(spans) - spans
+                lut = np.full(spans.sum(), -1, dtype=int)
+                for i, cats in enumerate(self.categories_):
+                    lut[lut_offsets[i] + cats - mins[i]] = np.arange(len(cats))
+                self._int_lut_ = (lut, lut_offsets, mins, maxs)
+
     def fit(self, X, y=None):
         """
         Fit OneHotEncoder to X.
@@ -376,6 +472,7 @@ class OneHotEncoder(_BaseEncoder):
         self._fit(X, handle_unknown=self.handle_unknown,
                   force_all_finite='allow-nan')
         self.drop_idx_ = self._compute_drop_idx()
+        self._compute_output_layout()
         return self
 
     def fit_transform(self, X, y=None):
@@ -397,7 +494,17 @@ class OneHotEncoder(_BaseEncoder):
             returned.
         """
         self._validate_keywords()
-        return super().fit_transform(X, y)
+        # validate X once and share the feature list between fit and
+        # transform
+        X_list, n_samples, n_features = self._check_X(
+            X, force_all_finite='allow-nan')
+        self._fit_list(X_list, n_samples, n_features,
+                       handle_unknown=self.handle_unknown)
+        self.drop_idx_ = self._compute_drop_idx()
+        self._compute_output_layout()
+        X_int, X_mask = self._transform_list(
+            X_list, n_samples, n_features, handle_unknown=self.handle_unknown)
+        return self._one_hot(X_int, X_mask)
 
     def transform(self, X):
         """
@@ -414,52 +521,83 @@ class OneHotEncoder(_BaseEncoder):
             returned.
         """
         check_is_fitted(self)
-        # validation of X happens in _check_X called by _transform
-        X_int, X_mask = self._transform(X, handle_unknown=self.handle_unknown,
-                                        force_all_finite='allow-nan')
+        encoded = None
+        if (self._int_lut_ is not None and isinstance(X, np.ndarray)
+                and X.dtype.kind in 'iu' and np.can_cast(X.dtype, np.int64)):
+            encoded = self._fast_integer_transform(X)
+        if encoded is None:
+            # validation of X happens in _check_X called by _transform
+            encoded = self._transform(X, handle_unknown=self.handle_unknown,
+                                      force_all_finite='allow-nan')
+        X_int, X_mask = encoded
+        return self._one_hot(X_int, X_mask)
+
+    def _fast_integer_transform(self, X):
+        """Encode an integer array with the lookup table of the categories.
+        Returns None if X is better left to `_transform`: if its shape does
+        not match the fitted categories or, with handle_unknown='error', it
+        holds unknown categories, `_transform` raises the usual errors.
+        """
+        if X.ndim != 2 or X.shape[0] == 0 or X.shape[1] != len(self.categories_):
+            return None
+        lut, lut_offsets, mins, maxs = self._int_lut_
+
+        # values out of the range of their feature are unknown, the others
+        # are looked up
+        in_range = (X >= mins) & (X <= maxs)
+        X_int = lut[lut_offsets + np.where(in_range, X - mins, 0)]
+        X_mask = in_range & (X_int >= 0)
+        if not np.all(X_mask):
+            if self.handle_unknown == 'error':
+                return None
+            X_int[~X_mask] = 0
+        return X_int, X_mask
 
+    def _one_hot(self, X_int, X_mask):
+        """Build the one-hot output from the encoded features and mask."""
         n_samples, n_features = X_int.shape
 
         if self.drop_idx_ is not None:
-            to_drop = self.drop_idx_.copy()
             # We remove all the dropped categories from mask, and decrement all
-            # categories that occur after them to avoid an empty column.
-            keep_cells = X_int != to_drop
-            n_values = []
-            for i, cats in enumerate(self.categories_):
-                n_cats = len(cats)
-
-                # drop='if_binary' but feature isn't binary
-                if to_drop[i] is None:
-                    # set to cardinality to not drop from X_int
-                    to_drop[i] = n_cats
-                    n_values.append(n_cats)
-                else:  # dropped
-                    n_values.append(n_cats - 1)
-
-            to_drop = to_drop.reshape(1, -1)
-            X_int[X_int > to_drop] -= 1
-            X_mask &= keep_cells
+            # categories that occur after them to avoid an empty column. Both
+            # are plain elementwise operations against the integer row of
+            # dropped indices, without a masked scatter.
+            to_drop = self._to_drop_
+            X_mask &= X_int != to_drop
+            X_int = X_int - (X_int > to_drop)
+
+        # with handle_unknown='error' and nothing dropped, every cell is kept
+        keep_all = self.handle_unknown == 'error' and self.drop_idx_ is None
+
+        feature_indices = self._feature_indices_
+        indices = (X_int + feature_indices[:-1]).ravel()
+        if keep_all:
+            rows = np.repeat(np.arange(n_samples), n_features)
         else:
-            n_values = [len(cats) for cats in self.categories_]
+            mask = X_mask.ravel()
+            indices = indices[mask]
+            rows = np.nonzero(X_mask)[0]
 
-        mask = X_mask.ravel()
-        feature_indices = np.cumsum([0] + n_values)
-        indices = (X_int + feature_indices[:-1]).ravel()[mask]
+        if not self.sparse:
+            # scatter the ones straight into the dense output rather than
+            # building a CSR matrix only to densify it
+            out = np.zeros((n_samples, feature_indices[-1]), dtype=self.dtype)
+            out[rows, indices] = 1
+            return out
 
         indptr = np.empty(n_samples + 1, dtype=int)
         indptr[0] = 0
-        np.sum(X_mask, axis=1, out=indptr[1:])
-        np.cumsum(indptr[1:], out=indptr[1:])
-        data = np.ones(indptr[-1])
-
-        out = sparse.csr_matrix((data, indices, indptr),
-                                shape=(n_samples, feature_indices[-1]),
-                                dtype=self.dtype)
-        if not self.sparse:
-            return out.toarray()
+        if keep_all:
+            # every sample has exactly one category per feature
+            indptr[1:] = np.arange(1, n_samples + 1) * n_features
         else:
-            return out
+            # running count of kept cells, read at the end of each row
+            indptr[1:] = np.cumsum(mask)[n_features - 1::n_features]
+        data = np.ones(len(indices))
+
+        return sparse.csr_matrix((data, indices, indptr),
+                                 shape=(n_samples, feature_indices[-1]),
+                                 dtype=self.dtype)
 
     def inverse_transform(self, X):
         """
@@ -481,14 +619,7 @@ class OneHotEncoder(_BaseEncoder):
 
         n_samples, _ = X.shape
         n_features = len(self.categories_)
-        if self.drop_idx_ is None:
-            n_transformed_features = sum(len(cats)
-                                         for cats in self.categories_)
-        else:
-            n_transformed_features = sum(
-                len(cats) - 1 if to_drop is not None else len(cats)
-                for cats, to_drop in zip(self.categories_, self.drop_idx_)
-            )
+        n_transformed_features = self._n_transformed_features_
 
         # validate shape of passed X
         msg = ("Shape of the passed X data is not correct. Expected {0} "
@@ -497,63 +628,86 @@ class OneHotEncoder(_BaseEncoder):
             raise ValueError(msg.format(n_transformed_features, X.shape[1]))
 
         # create resulting array of appropriate dtype
-        dt = np.find_common_type([cat.dtype for cat in self.categories_], [])
+        dt = self._out_dtype_
         X_tr = np.empty((n_samples, n_features), dtype=dt)
 
-        j = 0
-        found_unknown = {}
-
-        for i in range(n_features):
-            if self.drop_idx_ is None or self.drop_idx_[i] is None:
-                cats = self.categories_[i]
-            else:
-                cats = np.delete(self.categories_[i], self.drop_idx_[i])
-            n_categories = len(cats)
-
-            # Only happens if there was a column with a unique
-            # category. In this case we just fill the column with this
-            # unique category value.
-            if n_categories == 0:
-                X_tr[:, i] = self.categories_[i][self.drop_idx_[i]]
-                j += n_categories
-                continue
-            sub = X[:, j:j + n_categories]
-            # for sparse X argmax returns 2D matrix, ensure 1D array
-            labels = np.asarray(sub.argmax(axis=1)).flatten()
-            X_tr[:, i] = cats[labels]
-            if self.handle_unknown == 'ignore':
-                unknown = np.asarray(sub.sum(axis=1) == 0).flatten()
-                # ignored unknown categories: we have a row of all zero
-                if unknown.any():
-                    found_unknown[i] = unknown
-            else:
-                dropped = np.asarray(sub.sum(axis=1) == 0).flatten()
-                if dropped.any():
-                    if self.drop_idx_ is None:
-                        all_zero_samples = np.flatnonzero(dropped)
-                        raise ValueError(
-                            f"Samples {all_zero_samples} can not be inverted "
-                            "when drop=None and handle_unknown='error' "
-                            "because they contain all zeros")
-                    # we can safely assume that all of the nulls in each column
-                    # are the dropped value
-                    X_tr[dropped, i] = self.categories_[i][
-                        self.drop_idx_[i]
-                    ]
-
-            j += n_categories
-
-        # if ignored are found: potentially need to upcast result to
-        # insert None values
-        if found_unknown:
-            if X_tr.dtype != object:
-                X_tr = X_tr.astype(object)
-
-            for idx, mask in found_unknown.items():
-                X_tr[mask, idx] = None
+        kept_cats = self._cats_minus_drop_
+        n_cats = np.diff(self._feature_indices_)
+        starts = self._feature_indices_[:-1]
+
+        # position of the hot category in every feature block, and whether
+        # the block is all zeros
+        labels, all_zero = self._one_hot_labels(X, n_cats, starts)
+
+        has_cats = n_cats > 0
+        if has_cats.any():
+            # look every category up at once in the concatenated categories
+            cats_flat = np.concatenate([cats.astype(dt, copy=False)
+                                        for cats in kept_cats])
+            X_tr[:, has_cats] = cats_flat[(starts + labels)[:, has_cats]]
+        # Only happens if there was a column with a unique
+        # category. In this case we just fill the column with this
+        # unique category value.
+        for i in np.flatnonzero(~has_cats):
+            X_tr[:, i] = self.categories_[i][self.drop_idx_[i]]
+        all_zero[:, ~has_cats] = False
+
+        if self.handle_unknown == 'ignore':
+            # ignored unknown categories: we have a row of all zero
+            # if ignored are found: potentially need to upcast result to
+            # insert None values
+            if all_zero.any():
+                if X_tr.dtype != object:
+                    X_tr = X_tr.astype(object)
+                X_tr[all_zero] = None
+        elif all_zero.any():
+            if self.drop_idx_ is None:
+                i = np.flatnonzero(all_zero.any(axis=0))[0]
+                all_zero_samples = np.flatnonzero(all_zero[:, i])
+                raise ValueError(
+                    f"Samples {all_zero_samples} can not be inverted "
+                    "when drop=None and handle_unknown='error' "
+                    "because they contain all zeros")
+            # we can safely assume that all of the nulls in each column
+            # are the dropped value
+            for i in np.flatnonzero(all_zero.any(axis=0)):
+                X_tr[all_zero[:, i], i] = self.categories_[i][
+                    self.drop_idx_[i]
+                ]
 
         return X_tr
 
+    def _one_hot_labels(self, X, n_cats, starts):
+        """Decode the hot category of every feature block of X.
+        Returns the position of the maximum of every block and whether the
+        block sums to zero, both of shape (n_samples, n_features).
+        """
+        n_samples, _ = X.shape
+        n_features = len(n_cats)
+
+        if sparse.issparse(X) and np.all(X.data == 1):
+            # A one-hot matrix holds at most one stored value per sample
+            # and feature: the stored column directly gives the category.
+            rows = np.repeat(np.arange(n_samples), np.diff(X.indptr))
+            features = np.repeat(np.arange(n_features), n_cats)[X.indices]
+            cells = rows * n_features + features
+            if np.bincount(cells, minlength=n_samples * n_features).max() <= 1:
+                labels = np.zeros(n_samples * n_features, dtype=np.intp)
+                labels[cells] = X.indices - starts[features]
+                all_zero = np.ones(n_samples * n_features, dtype=bool)
+                all_zero[cells] = False
+                return (labels.reshape(n_samples, n_features),
+                        all_zero.reshape(n_samples, n_features))
+
+        labels = np.zeros((n_samples, n_features), dtype=np.intp)
+        all_zero = np.zeros((n_samples, n_features), dtype=bool)
+        for i in np.flatnonzero(n_cats):
+            sub = X[:, starts[i]:starts[i] + n_cats[i]]
+            # for sparse X argmax returns 2D matrix, ensure 1D array
+            labels[:, i] = np.asarray(sub.argmax(axis=1)).flatten()
+            all_zero[:, i] = np.asarray(sub.sum(axis=1) == 0).flatten()
+        return labels, all_zero
+
     def get_feature_names(self, input_features=None):
         """
         Return feature names for output features.
@@ -577,12 +731,13 @@ class OneHotEncoder(_BaseEncoder):
                 "features ({}), got {}".format(len(self.categories_),
                                                len(input_features)))
 
-        feature_names = []
-        for i in range(len(cats)):
-            names = [
-                input_features[i] + '_' + str(t) for t in cats[i]]
-            if self.drop_idx_ is not None and self.drop_idx_[i] is not None:
-                names.pop(self.drop_idx_[i])
-            feature_names.extend(names)
+        drop_idx = self.drop_idx_
+        if drop_idx is None:
+            drop_idx = [None] * len(cats)
+        # the dropped categories are skipped while building the names
+        feature_names = [
+            input_features[i] + '_' + str(t)
+            for i, (cats_i, to_drop) in enumerate(zip(cats, drop_idx))
+            for j, t in enumerate(cats_i) if j != to_drop]
 
-        return np.array(feature_names, dtype=object)
+        return np.asarray(feature_names, dtype=object)
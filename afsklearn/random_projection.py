@@ -27,17 +27,25 @@ The main theoretical result behind the efficiency of random projection is the
 #          Arnaud Joly <a.joly@ulg.ac.be>
 # License: BSD 3 clause
 
+import ctypes
+import math
+import threading
 import warnings
 from abc import ABCMeta, abstractmethod
+from functools import lru_cache
 
 import numpy as np
 import numbers
 import arrayfire as af
-import time
 import scipy.sparse as sp
 
 from .base import afBaseEstimator, afTransformerMixin
 
+from sklearn.exceptions import NotFittedError
+from sklearn.utils import gen_batches, get_chunk_n_rows
+from sklearn.utils.random import sample_without_replacement
+
+from ._type_utils import typemap
 from ._validation import check_is_fitted, check_random_state
 from ._extmath import safe_sparse_dot
 #from .utils.random import sample_without_replacement
@@ -60,6 +68,8 @@ class DataDimensionalityWarning(UserWarning):
 
 __all__ = [
     "GaussianRandomProjection",
+    "HadamardRandomProjection",
+    "SparseRandomProjection",
     "johnson_lindenstrauss_min_dim",
 ]
 
@@ -113,22 +123,46 @@ def johnson_lindenstrauss_min_dim(n_samples, *, eps=0.1):
            "An elementary proof of the Johnson-Lindenstrauss Lemma."
            http://citeseer.ist.psu.edu/viewdoc/summary?doi=10.1.1.45.3654
     """
+    if isinstance(n_samples, numbers.Real) and isinstance(eps, numbers.Real):
+        # the call made by fit, repeated with the same arguments in
+        # hyper-parameter searches
+        return _jl_min_dim_scalar(n_samples, eps)
+
     eps = np.asarray(eps)
     n_samples = np.asarray(n_samples)
 
-    if np.any(eps <= 0.0) or np.any(eps >= 1):
+    # reductions to a single value, no boolean temporaries
+    if eps.size and (eps.min() <= 0.0 or eps.max() >= 1):
         raise ValueError("The JL bound is defined for eps in ]0, 1[, got %r" % eps)
 
-    if np.any(n_samples) <= 0:
+    if n_samples.size and n_samples.min() <= 0:
         raise ValueError(
             "The JL bound is defined for n_samples greater than zero, got %r"
             % n_samples
         )
 
-    denominator = (eps ** 2 / 2) - (eps ** 3 / 3)
+    # eps^2 / 2 - eps^3 / 3 in Horner form, multiplications instead of
+    # np.power passes over eps
+    denominator = eps * eps * (0.5 - eps * (1.0 / 3.0))
     return (4 * np.log(n_samples) / denominator).astype(np.int64)
 
 
+@lru_cache(maxsize=128)
+def _jl_min_dim_scalar(n_samples, eps):
+    """johnson_lindenstrauss_min_dim for scalar arguments, in pure Python."""
+    if eps <= 0.0 or eps >= 1:
+        raise ValueError("The JL bound is defined for eps in ]0, 1[, got %r" % eps)
+
+    if n_samples <= 0:
+        raise ValueError(
+            "The JL bound is defined for n_samples greater than zero, got %r"
+            % n_samples
+        )
+
+    denominator = eps * eps * (0.5 - eps * (1.0 / 3.0))
+    return int(4 * math.log(n_samples) / denominator)
+
+
 def _check_density(density, n_features):
     """Factorize density check according to Li et al."""
     if density == "auto":
@@ -149,7 +183,44 @@ def _check_input_size(n_components, n_features):
         raise ValueError("n_features must be strictly positive, got %d" % n_features)
 
 
-def _gaussian_random_matrix(n_components, n_features, random_state=None):
+def _set_af_seed(random_state):
+    """Seed the ArrayFire random engine from random_state.
+    Only integer seeds are forwarded, None and RandomState instances keep
+    using the current state of the engine.
+    """
+    if random_state and not isinstance(random_state, np.random.RandomState):
+        af.random.set_seed(random_state)
+    if random_state is None or random_state is np.random:
+        pass #use default rng
+        #af.random.set_seed(random_state)
+    if isinstance(random_state, numbers.Integral):
+        af.random.set_seed(random_state)
+    if isinstance(random_state, np.random.RandomState):
+        pass #use default rng
+
+
+def _check_dtype(dtype):
+    """Check that the projection can run in dtype on the device."""
+    dtype = np.dtype(dtype)
+    if dtype not in (np.float16, np.float32, np.float64):
+        # ArrayFire has no integer GEMM, so quantized components would only
+        # be cast back to floating point before every product
+        raise ValueError(
+            "dtype must be one of float16, float32 or float64, got %s"
+            % dtype)
+    return dtype
+
+
+def _host_dtype(dtype):
+    """The host type of the arrays uploaded to or read back from a device
+    array of type dtype. ArrayFire's interop has no half precision, so
+    float16 arrays cross the bus as float32 and are cast on the device."""
+    dtype = np.dtype(dtype)
+    return np.dtype(np.float32) if dtype == np.float16 else dtype
+
+
+def _gaussian_random_matrix(n_components, n_features, random_state=None,
+                            dtype=np.float32):
     """Generate a dense Gaussian random matrix.
     The components of the random matrix are drawn from
         N(0, 1.0 / n_components).
@@ -165,39 +236,241 @@ def _gaussian_random_matrix(n_components, n_features, random_state=None):
         at fit time.
         Pass an int for reproducible output across multiple function calls.
         See :term:`Glossary <random_state>`.
+    dtype : numpy dtype, default=np.float32
+        Floating point type of the generated matrix.
     Returns
     -------
-    components : ndarray of shape (n_components, n_features)
-        The generated Gaussian random matrix.
+    components : af.Array of shape (n_features, n_components)
+        The transpose of the generated Gaussian random matrix, laid out for
+        a plain ``af.matmul`` with the data.
     See Also
     --------
     GaussianRandomProjection
     """
     _check_input_size(n_components, n_features)
+    dtype = _check_dtype(dtype)
     #rng = check_random_state(random_state)
     #components = rng.normal(
         #loc=0.0, scale=1.0 / np.sqrt(n_components), size=(n_components, n_features)
     #)
 
-    if random_state and not isinstance(random_state, np.random.RandomState):
-        af.random.set_seed(random_state)
-    if random_state is None or random_state is np.random:
-        pass #use default rng
-        #af.random.set_seed(random_state)
-    if isinstance(random_state, numbers.Integral):
-        af.random.set_seed(random_state)
+    rng = _gaussian_rng(random_state)
+    scale = 1.0 / math.sqrt(n_components)
+    return _gaussian_columns(n_features, n_components, scale, dtype, rng)
+
+
+def _gaussian_rng(random_state):
+    """Prepare the draws of _gaussian_columns.
+    NumPy's vectorized ziggurat sampler is much faster than the Box-Muller
+    of ArrayFire's CPU backend, so a NumPy Generator is returned for it.
+    On the other backends the ArrayFire engine is seeded and None returned.
+    """
+    if af.get_active_backend() != "cpu":
+        _set_af_seed(random_state)
+        return None
     if isinstance(random_state, np.random.RandomState):
-        pass #use default rng
+        random_state = random_state.randint(np.iinfo(np.int32).max)
+    elif random_state is np.random:
+        random_state = None
+    return np.random.default_rng(random_state)
+
+
+def _gaussian_columns(n_features, n_columns, scale, dtype, rng):
+    """Draw the next n_columns of a transposed Gaussian random matrix,
+    as an af.Array of shape (n_features, n_columns)."""
+    if rng is not None:
+        # drawn as (n_columns, n_features) so that its transpose is Fortran
+        # ordered and uploaded without a reorder
+        draw_dtype = np.float64 if np.dtype(dtype) == np.float64 else np.float32
+        components = rng.standard_normal((n_columns, n_features),
+                                         dtype=draw_dtype)
+        components *= scale
+        return af.interop.from_ndarray(components.T).as_type(
+            typemap(np.dtype(dtype)))
+
+    # the scaling stays in ArrayFire's JIT tree until evaluated, forcing it
+    # here fuses it into the RNG kernel instead of writing the matrix twice.
+    components = af.randn(n_features, n_columns,
+                          dtype=typemap(np.dtype(dtype))) * scale
+    af.eval(components)
+    return components
+
+
+# Below this density the sparse product beats a dense GEMM on the
+# projection matrix, above it the matrix is kept dense.
+_SPARSE_DENSITY_THRESHOLD = 0.01
+
+
+def _sparse_random_matrix(n_components, n_features, density="auto",
+                          random_state=None):
+    """Generalized Achlioptas random sparse matrix for random projection.
+    Setting density to 1 / 3 will yield the original matrix by Dimitris
+    Achlioptas while setting a lower value will yield the generalization
+    by Ping Li et al.
+    If we note :math:`s = 1 / density`, the components of the random matrix
+    are drawn from:
+      - -sqrt(s) / sqrt(n_components)   with probability 1 / 2s
+      -  0                              with probability 1 - 1 / s
+      - +sqrt(s) / sqrt(n_components)   with probability 1 / 2s
+    Read more in the :ref:`User Guide <sparse_random_matrix>`.
+    Parameters
+    ----------
+    n_components : int,
+        Dimensionality of the target projection space.
+    n_features : int,
+        Dimensionality of the original source space.
+    density : float or 'auto', default='auto'
+        Ratio of non-zero component in the random projection matrix in the
+        range `(0, 1]`
+        If density = 'auto', the value is set to the minimum density
+        as recommended by Ping Li et al.: 1 / sqrt(n_features).
+        Use density = 1 / 3.0 if you want to reproduce the results from
+        Achlioptas, 2001.
+    random_state : int, RandomState instance or None, default=None
+        Controls the pseudo random number generator used to generate the matrix
+        at fit time.
+        Pass an int for reproducible output across multiple function calls.
+        See :term:`Glossary <random_state>`.
+    Returns
+    -------
+    components : af.Array
+        The generated random matrix. Sparse CSR of shape
+        (n_components, n_features) when `density` is below 1%, otherwise
+        dense and transposed, of shape (n_features, n_components), like
+        `_gaussian_random_matrix`.
+    See Also
+    --------
+    SparseRandomProjection
+    References
+    ----------
+    .. [1] Ping Li, T. Hastie and K. W. Church, 2006,
+           "Very Sparse Random Projections".
+           https://web.stanford.edu/~hastie/Papers/Ping/KDD06_rp.pdf
+    .. [2] D. Achlioptas, 2001, "Database-friendly random projections",
+           http://www.cs.ucsc.edu/~optas/papers/jl.pdf
+    """
+    _check_input_size(n_components, n_features)
+    density = _check_density(density, n_features)
 
-    scale = 1.0 / np.sqrt(n_components)
-    components_af = af.randn(n_components, n_features) * scale
-    #tmp?
-    #components = components_af.to_ndarray()
-    components = components_af
+    scale = math.sqrt(1.0 / density) / math.sqrt(n_components)
+    if density < _SPARSE_DENSITY_THRESHOLD:
+        # only the nonzero components are drawn, as in scikit-learn: their
+        # number and columns in every row, then their signs. No dense
+        # matrix is ever built, on the host nor on the device.
+        rng = check_random_state(random_state)
+        indices = []
+        offset = 0
+        indptr = [offset]
+        for _ in range(n_components):
+            n_nonzero_i = rng.binomial(n_features, density)
+            indices_i = sample_without_replacement(
+                n_features, n_nonzero_i, random_state=rng)
+            indices.append(indices_i)
+            offset += n_nonzero_i
+            indptr.append(offset)
+        indices = np.concatenate(indices)
+        data = (rng.binomial(1, 0.5, size=np.size(indices)) * 2 - 1) * scale
+        components = sp.csr_matrix((data, indices, indptr),
+                                   shape=(n_components, n_features))
+        components.sort_indices()
+        return _csr_from_scipy(components)
 
+    _set_af_seed(random_state)
+    # a single uniform draw picks both the pattern and the sign: values
+    # below density / 2 are negative, values in [density / 2, density)
+    # positive and the others zero.
+    u = af.randu(n_features, n_components)
+    components = ((u < density).as_type(af.Dtype.f32) -
+                  2 * (u < density / 2).as_type(af.Dtype.f32)) * scale
+    af.eval(components)
     return components
 
 
+# Host arrays at least this large, and at most _PINNED_MAX_BYTES once cast,
+# are uploaded through a page-locked staging buffer on GPU backends.
+_PINNED_MIN_BYTES = 1 << 20
+_PINNED_MAX_BYTES = 1 << 28
+# The staging buffer is shared by all estimators rather than held by them,
+# so that fitted estimators stay picklable. It grows up to
+# _PINNED_MAX_BYTES, larger inputs are copied from pageable memory.
+_pinned_lock = threading.Lock()
+_pinned_buffer = {"ptr": None, "nbytes": 0}
+
+
+def _to_device(X, dtype=None):
+    """Copy the host array X to the device.
+    On GPU backends, large arrays are first copied to page-locked memory,
+    which the driver transfers from by DMA at full bus bandwidth instead of
+    staging the pageable pages itself. That copy also casts X to `dtype`
+    when given, so that no wider values cross the bus than the product
+    uses.
+    """
+    if isinstance(X, np.ndarray) and X.dtype == np.float16:
+        # see _host_dtype, keeps the memory order of X
+        X = X.astype(np.float32)
+    if (not isinstance(X, np.ndarray) or
+            not (X.flags["C_CONTIGUOUS"] or X.flags["F_CONTIGUOUS"]) or
+            X.nbytes < _PINNED_MIN_BYTES or af.get_active_backend() == "cpu"):
+        return af.interop.from_ndarray(X)
+
+    dtype = X.dtype if dtype is None else np.dtype(dtype)
+    nbytes = X.size * dtype.itemsize
+    if nbytes > _PINNED_MAX_BYTES:
+        return af.interop.from_ndarray(X)
+    with _pinned_lock:
+        if _pinned_buffer["nbytes"] < nbytes:
+            if _pinned_buffer["ptr"] is not None:
+                af.device.free_pinned(_pinned_buffer["ptr"])
+            _pinned_buffer["ptr"] = af.device.alloc_pinned(nbytes)
+            _pinned_buffer["nbytes"] = nbytes
+        staging = np.ndarray(
+            X.shape, dtype=dtype,
+            # alloc_pinned returns the address as an int
+            buffer=(ctypes.c_char * nbytes).from_address(
+                _pinned_buffer["ptr"]),
+            order="C" if X.flags["C_CONTIGUOUS"] else "F")
+        np.copyto(staging, X, casting="unsafe")
+        # the upload is complete when from_ndarray returns, the buffer can
+        # be reused right after
+        return af.interop.from_ndarray(staging)
+
+
+def _upload_samples(X, dtype=None):
+    """Copy the 2D host array X to the device without reordering it.
+    A Fortran ordered X matches the column-major layout of ArrayFire and is
+    copied as is. A C ordered X is read by ArrayFire as X.T, and is kept
+    that way, the products then apply the transpose through their GEMM
+    flags instead of a reorder on the device.
+    Returns
+    -------
+    X_af : af.Array
+        X, or its transpose when `transposed` is True.
+    transposed : bool
+    """
+    if X.flags["F_CONTIGUOUS"] and not X.flags["C_CONTIGUOUS"]:
+        return _to_device(X, dtype), False
+    return _to_device(X.T, dtype), True
+
+
+def _csr_to_scipy(components_af):
+    """Copy an ArrayFire CSR array to a scipy CSR matrix."""
+    return sp.csr_matrix(
+        (af.sparse.sparse_get_values(components_af).to_ndarray(),
+         af.sparse.sparse_get_col_idx(components_af).to_ndarray(),
+         af.sparse.sparse_get_row_idx(components_af).to_ndarray()),
+        shape=components_af.dims())
+
+
+def _csr_from_scipy(components):
+    """Copy a scipy sparse matrix to an ArrayFire CSR array."""
+    components = sp.csr_matrix(components, dtype=np.float32)
+    return af.sparse.create_sparse(
+        af.interop.from_ndarray(components.data),
+        af.interop.from_ndarray(components.indptr.astype(np.int32)),
+        af.interop.from_ndarray(components.indices.astype(np.int32)),
+        components.shape[0], components.shape[1], af.STORAGE.CSR)
+
+
 class BaseRandomProjection(afTransformerMixin, afBaseEstimator, metaclass=ABCMeta):
     """Base class for random projections.
     Warning: This class should not be used directly.
@@ -224,9 +497,8 @@ class BaseRandomProjection(afTransformerMixin, afBaseEstimator, metaclass=ABCMet
             Dimensionality of the original source space.
         Returns
         -------
-        components : {ndarray, sparse matrix} of shape \
-                (n_components, n_features)
-            The generated random matrix. Sparse matrix will be of CSR format.
+        components : af.Array of shape (n_features, n_components)
+            The transpose of the generated random matrix.
         """
 
     def fit(self, X, y=None):
@@ -243,12 +515,15 @@ class BaseRandomProjection(afTransformerMixin, afBaseEstimator, metaclass=ABCMet
         -------
         self
         """
-        t0 = time.perf_counter()
         X = self._validate_data(X, accept_sparse=["csr", "csc"])
 
         n_samples, n_features = X.shape
+        self._fit_n_components(n_samples, n_features)
+        self._fit_components(n_features)
+        return self
 
-        t1 = time.perf_counter()
+    def _fit_n_components(self, n_samples, n_features):
+        """Set n_components_, from the JL bound when n_components='auto'."""
         if self.n_components == "auto":
             self.n_components_ = johnson_lindenstrauss_min_dim(
                 n_samples=n_samples, eps=self.eps
@@ -267,7 +542,6 @@ class BaseRandomProjection(afTransformerMixin, afBaseEstimator, metaclass=ABCMet
                     "n_features=%d"
                     % (self.eps, n_samples, self.n_components_, n_features)
                 )
-            t2 = time.perf_counter()
         else:
             if self.n_components <= 0:
                 raise ValueError(
@@ -284,60 +558,200 @@ class BaseRandomProjection(afTransformerMixin, afBaseEstimator, metaclass=ABCMet
                 )
 
             self.n_components_ = self.n_components
-            t2 = time.perf_counter()
 
-        # Generate a projection matrix of size [n_components, n_features]
+    def _fit_components(self, n_features):
+        """Generate the projection matrix, on the device and on the host."""
+        # Generate a projection matrix of size [n_components, n_features],
+        # dense ones are kept transposed on the device so that transform is
+        # a plain matmul
         self.components_af_ = self._make_random_matrix(self.n_components_, n_features)
-        self.components_ = self.components_af_.to_ndarray()
-        t3 = time.perf_counter()
+        # cached, the data is cast to it on every transform
+        self.components_dtype_af_ = self.components_af_.dtype()
+        if self.components_af_.is_sparse():
+            self.components_ = _csr_to_scipy(self.components_af_)
+        else:
+            components_af = self.components_af_
+            if self.components_dtype_af_ == af.Dtype.f16:
+                # kept in float32 on the host, see _host_dtype
+                components_af = components_af.as_type(af.Dtype.f32)
+            # reshaped since ArrayFire drops the trailing unit dimension when
+            # n_components == 1
+            self.components_ = components_af.to_ndarray().reshape(
+                n_features, self.n_components_).T
+
+        self._synced_components = self.components_
 
         # Check contract
         assert self.components_.shape == (self.n_components_, n_features), (
             "An error has occurred the self.components_ matrix has "
             " not the proper shape."
         )
-        return self
 
-    def transform(self, X):
+    def transform(self, X, return_device=False, check_input=True):
         """Project the data by using matrix product with the random matrix
         Parameters
         ----------
-        X : {ndarray, sparse matrix} of shape (n_samples, n_features)
+        X : {ndarray, sparse matrix, af.Array} of shape (n_samples, n_features)
             The input data to project into a smaller dimensional space.
+            An af.Array is used in place, without validation nor copy to
+            the device. A sparse matrix is densified by row panels.
+        check_input : bool, default=True
+            Allow to bypass several input checking.
+            Don't use this parameter unless you know what you do.
+        return_device : bool, default=False
+            If True, return the projection as an af.Array left on the
+            device, saving the copy back to the host when it is fed to
+            another ArrayFire estimator. Always the case for an af.Array X.
         Returns
         -------
-        X_new : {ndarray, sparse matrix} of shape (n_samples, n_components)
-            Projected array.
+        X_new : {ndarray, af.Array} of shape (n_samples, n_components)
+            Projected array. A sparse matrix if X and components_ are sparse
+            and dense_output is False.
         """
-
-        t0 = time.perf_counter()
         check_is_fitted(self)
         self.check_external_components_modified()#[WARN] in d3m, primitives can "restore" private class variables...
-        X = self._validate_data(X, accept_sparse=["csr", "csc"], reset=False)
-        t1 = time.perf_counter()
+        if isinstance(X, af.Array):
+            return_device = True
+            X_af = X
+            n_features = X.elements() // X.dims()[0]
+        else:
+            if check_input:
+                X = self._validate_data(X, accept_sparse=["csr", "csc"],
+                                        reset=False)
+            X_af = None
+            n_features = X.shape[1]
 
-        if X.shape[1] != self.components_af_.shape[1]:
+        if n_features != self.n_features_in_:
             raise ValueError(
                 "Impossible to perform projection:"
                 "X at fit stage had a different number of features. "
-                "(%s != %s)" % (X.shape[1], self.components_af_.shape[1])
+                "(%s != %s)" % (n_features, self.n_features_in_)
             )
 
         #X_new = safe_sparse_dot(X, self.components_.T, dense_output=self.dense_output)
         #import pdb; pdb.set_trace()
-        X_af = af.interop.from_ndarray(X).as_type(self.components_af_.dtype())
-        X_new = af.matmulNT(X_af, self.components_af_)
-        X_new = X_new.to_ndarray()
-        t2 = time.perf_counter()
+        n_samples = X.shape[0] if X_af is None else X_af.dims()[0]
+        # rows of X and of the projection held on the device at once, sized
+        # for float64
+        chunk_n_rows = get_chunk_n_rows(
+            row_bytes=(n_features + self.n_components_) * 8,
+            max_n_rows=n_samples)
+        if X_af is not None or return_device or chunk_n_rows == n_samples:
+            if X_af is None:
+                # the projection runs on the device from a dense copy of X
+                X_dense = X.toarray() if sp.issparse(X) else X
+                X_new = self._project(
+                    *_upload_samples(X_dense, self._upload_dtype()))
+            else:
+                X_new = self._project(X_af)
+            if not return_device:
+                # reshaped since ArrayFire drops the trailing unit dimension
+                # when n_components == 1
+                X_new = X_new.to_ndarray().reshape(n_samples, self.n_components_)
+                X_new = self._sparse_output(X, X_new)
+            return X_new
+
+        # X does not fit in working_memory: stream it by row panels against
+        # the projection matrix, which stays on the device
+        if sp.issparse(X):
+            X = X.tocsr()
+        X_new = None
+        for batch in gen_batches(n_samples, chunk_n_rows):
+            # row panels of a Fortran ordered X are not contiguous, they are
+            # copied in the same order
+            if sp.issparse(X):
+                X_batch = X[batch].toarray()
+            elif X.flags["F_CONTIGUOUS"]:
+                X_batch = np.asfortranarray(X[batch])
+            else:
+                X_batch = np.ascontiguousarray(X[batch])
+            panel = self._project(
+                *_upload_samples(X_batch, self._upload_dtype())).to_ndarray()
+            if X_new is None:
+                X_new = np.empty((n_samples, self.n_components_),
+                                 dtype=panel.dtype)
+            X_new[batch] = panel.reshape(-1, self.n_components_)
+        return self._sparse_output(X, X_new)
+
+    def _sparse_output(self, X, X_new):
+        """Return the projection of X as sklearn's safe_sparse_dot would, a
+        sparse matrix for sparse X and components_ unless dense_output."""
+        if (sp.issparse(X) and sp.issparse(getattr(self, 'components_', None))
+                and not self.dense_output):
+            return sp.csr_matrix(X_new)
+        return X_new
+
+    def _upload_dtype(self):
+        """The type the samples are cast to before they are uploaded."""
+        return _host_dtype(typemap(self.components_dtype_af_))
+
+    def _project(self, X_af, transposed=False):
+        """Multiply X_af, of shape (n_samples, n_features), by the transpose
+        of the projection matrix on the device. X_af holds the transpose of
+        the samples when `transposed` is True."""
+        X_af = X_af.as_type(self.components_dtype_af_)
+        if self.components_af_.is_sparse():
+            # ArrayFire only takes the sparse operand on the left
+            X_new = af.matmul(self.components_af_,
+                              X_af if transposed else X_af.T).T
+        else:
+            X_new = af.matmul(X_af, self.components_af_,
+                              lhs_opts=(af.MATPROP.TRANS if transposed
+                                        else af.MATPROP.NONE))
+        if X_new.dtype() == af.Dtype.f16:
+            # half precision is only used for the product
+            X_new = X_new.as_type(af.Dtype.f32)
         return X_new
 
     #TMP workaround for external private member modifications
     def check_external_components_modified(self):
+        if not hasattr(self, 'components_'):
+            raise NotFittedError(
+                "This %s instance was fitted by fit_transform with "
+                "store_components=False, call 'fit' before using this "
+                "estimator." % type(self).__name__)
+
+        if (hasattr(self, 'components_af_') and
+                getattr(self, '_synced_components', None) is self.components_):
+            # the device copy was made from these very components, skip the
+            # device queries below
+            return
+
+        if not self._device_components_match():
+            if not sp.issparse(self.components_):
+                self._upload_dense_components(self.components_)
+            elif (self.components_.nnz < _SPARSE_DENSITY_THRESHOLD *
+                    self.components_.shape[0] * self.components_.shape[1]):
+                self.components_af_ = _csr_from_scipy(self.components_)
+                self.components_dtype_af_ = self.components_af_.dtype()
+            else:
+                # same layout as _sparse_random_matrix chooses
+                self._upload_dense_components(self.components_.toarray())
+        self._synced_components = self.components_
+
+    def _device_components_match(self):
+        """Whether components_af_ exists with the shape of components_,
+        sparse or dense and transposed."""
         if not hasattr(self, 'components_af_'):
-            self.components_af_ = af.interop.from_ndarray(self.components_)
+            return False
+        n_components, n_features = self.components_.shape
+        if self.components_af_.is_sparse():
+            return self.components_af_.dims() == (n_components, n_features)
+        return (self.components_af_.elements() == n_components * n_features
+                and self.components_af_.dims()[0] == n_features)
 
-        if self.components_.shape != self.components_af_.shape:
-            self.components_af_ = af.interop.from_ndarray(self.components_)
+    def _upload_dense_components(self, components):
+        """Copy the dense components to the device, transposed. Half
+        precision components are rebuilt in half precision although the
+        host holds them in float32."""
+        half = (components.dtype == np.float16 or
+                getattr(self, 'components_dtype_af_', None) == af.Dtype.f16)
+        components = components.T.astype(_host_dtype(components.dtype),
+                                         copy=False)
+        self.components_af_ = af.interop.from_ndarray(components)
+        if half:
+            self.components_af_ = self.components_af_.as_type(af.Dtype.f16)
+        self.components_dtype_af_ = self.components_af_.dtype()
 
 
 
@@ -368,12 +782,26 @@ class GaussianRandomProjection(BaseRandomProjection):
         projection matrix at fit time.
         Pass an int for reproducible output across multiple function calls.
         See :term:`Glossary <random_state>`.
+    dtype : numpy dtype, default=np.float32
+        Floating point type of the projection matrix, the data is cast to it
+        before the projection. ``np.float16`` halves the memory traffic and
+        lets the CUDA backend use tensor cores, at a precision well within
+        the ``eps`` distortion budget. The projected data is returned as
+        ``np.float32`` in that case. Integer types are not supported,
+        ArrayFire has no integer matrix product.
+    store_components : bool, default=True
+        If False, `fit_transform` generates the projection matrix by column
+        blocks, applies each block as soon as it is drawn and keeps none of
+        them, for a one-shot projection whose peak memory does not include
+        the whole matrix. `transform` can not be called afterwards.
+        `fit` always stores the matrix.
     Attributes
     ----------
     n_components_ : int
         Concrete number of components computed when n_components="auto".
     components_ : ndarray of shape (n_components, n_features)
-        Random matrix used for the projection.
+        Random matrix used for the projection. Not set by `fit_transform`
+        when ``store_components=False``.
     n_features_in_ : int
         Number of features seen during :term:`fit`.
         .. versionadded:: 0.24
@@ -392,13 +820,64 @@ class GaussianRandomProjection(BaseRandomProjection):
     SparseRandomProjection
     """
 
-    def __init__(self, n_components="auto", *, eps=0.1, random_state=None):
+    def __init__(self, n_components="auto", *, eps=0.1, random_state=None,
+                 dtype=np.float32, store_components=True):
         super().__init__(
             n_components=n_components,
             eps=eps,
             dense_output=True,
             random_state=random_state,
         )
+        self.dtype = dtype
+        self.store_components = store_components
+
+    def fit_transform(self, X, y=None):
+        """Generate the random projection matrix and project X with it.
+        Parameters
+        ----------
+        X : {ndarray, sparse matrix} of shape (n_samples, n_features)
+            The input data to project into a smaller dimensional space.
+        y
+            Ignored
+        Returns
+        -------
+        X_new : ndarray of shape (n_samples, n_components)
+            Projected array.
+        """
+        if self.store_components:
+            return super().fit_transform(X, y)
+
+        for name in ("components_", "components_af_", "components_dtype_af_",
+                     "_synced_components"):
+            if hasattr(self, name):
+                delattr(self, name)
+        # X is uploaded dense and whole
+        X = self._validate_data(X, accept_sparse=False)
+        n_samples, n_features = X.shape
+        self._fit_n_components(n_samples, n_features)
+        _check_input_size(self.n_components_, n_features)
+        _check_dtype(self.dtype)
+        rng = _gaussian_rng(self.random_state)
+
+        dtype = typemap(np.dtype(self.dtype))
+        scale = 1.0 / math.sqrt(self.n_components_)
+        X_af, transposed = _upload_samples(X, _host_dtype(self.dtype))
+        X_af = X_af.as_type(dtype)
+        lhs_opts = af.MATPROP.TRANS if transposed else af.MATPROP.NONE
+        # columns of the projection matrix alive at once, the draws match
+        # the ones of _gaussian_random_matrix when they all fit, and always
+        # on the CPU backend
+        block = get_chunk_n_rows(row_bytes=n_features * 8,
+                                 max_n_rows=self.n_components_)
+        X_new = af.constant(0, n_samples, self.n_components_, dtype=dtype)
+        for columns in gen_batches(self.n_components_, block):
+            components = _gaussian_columns(
+                n_features, columns.stop - columns.start, scale, self.dtype,
+                rng)
+            X_new[:, columns] = af.matmul(X_af, components, lhs_opts=lhs_opts)
+        if X_new.dtype() == af.Dtype.f16:
+            X_new = X_new.as_type(af.Dtype.f32)
+        return X_new.to_ndarray().reshape(n_samples, self.n_components_)
 
     def _make_random_matrix(self, n_components, n_features):
         """ Generate the random projection matrix.
@@ -410,11 +889,279 @@ class GaussianRandomProjection(BaseRandomProjection):
             Dimensionality of the original source space.
         Returns
         -------
-        components : {ndarray, sparse matrix} of shape \
-                (n_components, n_features)
-            The generated random matrix. Sparse matrix will be of CSR format.
+        components : af.Array of shape (n_features, n_components)
+            The transpose of the generated random matrix.
         """
         #random_state = check_random_state(self.random_state)
         return _gaussian_random_matrix(
-            n_components, n_features, random_state=self.random_state
+            n_components, n_features, random_state=self.random_state,
+            dtype=self.dtype
         )
+
+
+class SparseRandomProjection(BaseRandomProjection):
+    """Reduce dimensionality through sparse random projection.
+    Sparse random matrix is an alternative to dense random
+    projection matrix that guarantees similar embedding quality while being
+    much more memory efficient and allowing faster computation of the
+    projected data.
+    If we note `s = 1 / density` the components of the random matrix are
+    drawn from:
+      - -sqrt(s) / sqrt(n_components)   with probability 1 / 2s
+      -  0                              with probability 1 - 1 / s
+      - +sqrt(s) / sqrt(n_components)   with probability 1 / 2s
+    The projection matrix is stored as an ArrayFire sparse CSR array and
+    applied with a sparse-dense product when `density` is below 1%, where it
+    beats a dense GEMM, and kept dense otherwise.
+    Read more in the :ref:`User Guide <sparse_random_matrix>`.
+    .. versionadded:: 0.13
+    Parameters
+    ----------
+    n_components : int or 'auto', default='auto'
+        Dimensionality of the target projection space.
+        n_components can be automatically adjusted according to the
+        number of samples in the dataset and the bound given by the
+        Johnson-Lindenstrauss lemma. In that case the quality of the
+        embedding is controlled by the ``eps`` parameter.
+        It should be noted that Johnson-Lindenstrauss lemma can yield
+        very conservative estimated of the required number of components
+        as it makes no assumption on the structure of the dataset.
+    density : float or 'auto', default='auto'
+        Ratio in the range (0, 1] of non-zero component in the random
+        projection matrix.
+        If density = 'auto', the value is set to the minimum density
+        as recommended by Ping Li et al.: 1 / sqrt(n_features).
+        Use density = 1 / 3.0 if you want to reproduce the results from
+        Achlioptas, 2001.
+    eps : float, default=0.1
+        Parameter to control the quality of the embedding according to
+        the Johnson-Lindenstrauss lemma when n_components is set to
+        'auto'. This value should be strictly positive.
+        Smaller values lead to better embedding and higher number of
+        dimensions (n_components) in the target projection space.
+    dense_output : bool, default=False
+        If True, ensure that the output of the random projection is a
+        dense numpy array even if the input and random projection matrix
+        are both sparse. In practice, if the number of components is
+        small the number of zero components in the projected data will
+        be very small and it will be more CPU and memory efficient to
+        use a dense representation.
+        If False, the projected data uses a sparse representation if
+        the input is sparse.
+    random_state : int, RandomState instance or None, default=None
+        Controls the pseudo random number generator used to generate the
+        projection matrix at fit time.
+        Pass an int for reproducible output across multiple function calls.
+        See :term:`Glossary <random_state>`.
+    Attributes
+    ----------
+    n_components_ : int
+        Concrete number of components computed when n_components="auto".
+    components_ : sparse matrix of shape (n_components, n_features)
+        Random matrix used for the projection. Sparse matrix will be of CSR
+        format. The device copy is dense when ``density_`` is 1% or more.
+    density_ : float in range 0.0 - 1.0
+        Concrete density computed from when density = "auto".
+    n_features_in_ : int
+        Number of features seen during :term:`fit`.
+        .. versionadded:: 0.24
+    Examples
+    --------
+    >>> import numpy as np
+    >>> from sklearn.random_projection import SparseRandomProjection
+    >>> rng = np.random.RandomState(42)
+    >>> X = rng.rand(100, 10000)
+    >>> transformer = SparseRandomProjection(random_state=rng)
+    >>> X_new = transformer.fit_transform(X)
+    >>> X_new.shape
+    (100, 3947)
+    See Also
+    --------
+    GaussianRandomProjection
+    References
+    ----------
+    .. [1] Ping Li, T. Hastie and K. W. Church, 2006,
+           "Very Sparse Random Projections".
+           https://web.stanford.edu/~hastie/Papers/Ping/KDD06_rp.pdf
+    .. [2] D. Achlioptas, 2001, "Database-friendly random projections",
+           https://users.soe.ucsc.edu/~optas/papers/jl.pdf
+    """
+
+    def __init__(
+        self,
+        n_components="auto",
+        *,
+        density="auto",
+        eps=0.1,
+        dense_output=False,
+        random_state=None,
+    ):
+        super().__init__(
+            n_components=n_components,
+            eps=eps,
+            dense_output=dense_output,
+            random_state=random_state,
+        )
+
+        self.density = density
+
+    def _make_random_matrix(self, n_components, n_features):
+        """ Generate the random projection matrix
+        Parameters
+        ----------
+        n_components : int
+            Dimensionality of the target projection space.
+        n_features : int
+            Dimensionality of the original source space.
+        Returns
+        -------
+        components : af.Array
+            The generated random matrix, sparse CSR of shape
+            (n_components, n_features) or dense and transposed.
+        """
+        self.density_ = _check_density(self.density, n_features)
+        return _sparse_random_matrix(
+            n_components, n_features, density=self.density_,
+            random_state=self.random_state
+        )
+
+    def _fit_components(self, n_features):
+        super()._fit_components(n_features)
+        if not sp.issparse(self.components_):
+            # the dense layout is only the one of the device copy
+            self.components_ = sp.csr_matrix(self.components_)
+            self._synced_components = self.components_
+
+
+def _fwht(X_af):
+    """Unnormalized fast Walsh-Hadamard transform of the rows of X_af.
+    The number of columns must be a power of two. Each of the log2 passes
+    applies the butterflies of one level: a reshape brings the pairs of
+    columns h apart on the third dimension.
+    """
+    n_samples, n_columns = X_af.dims()[0], X_af.elements() // X_af.dims()[0]
+    h = 1
+    while h < n_columns:
+        Y = af.moddims(X_af, n_samples, h, 2, n_columns // (2 * h))
+        top = Y[:, :, 0, :]
+        bottom = Y[:, :, 1, :]
+        X_af = af.moddims(af.join(2, top + bottom, top - bottom),
+                          n_samples, n_columns)
+        h *= 2
+    return X_af
+
+
+class HadamardRandomProjection(BaseRandomProjection):
+    """Reduce dimensionality through a subsampled randomized Hadamard
+    transform (SRHT).
+    The projection is ``sqrt(1 / n_components) * S H D`` where ``D`` is a
+    random diagonal of signs, ``H`` the Walsh-Hadamard matrix of the
+    features zero padded to the next power of two and ``S`` picks
+    ``n_components`` of its rows at random. ``H`` is applied with a fast
+    transform, so projecting costs O(n_samples * n_features * log(n_features))
+    instead of the O(n_samples * n_features * n_components) of a dense
+    random matrix, and only O(n_features) values are stored.
+    The Johnson-Lindenstrauss bound used when ``n_components='auto'`` is
+    the one of the Gaussian projection.
+    Parameters
+    ----------
+    n_components : int or 'auto', default='auto'
+        Dimensionality of the target projection space.
+        n_components can be automatically adjusted according to the
+        number of samples in the dataset and the bound given by the
+        Johnson-Lindenstrauss lemma. In that case the quality of the
+        embedding is controlled by the ``eps`` parameter.
+    eps : float, default=0.1
+        Parameter to control the quality of the embedding according to
+        the Johnson-Lindenstrauss lemma when `n_components` is set to
+        'auto'. The value should be strictly positive.
+    random_state : int, RandomState instance or None, default=None
+        Controls the pseudo random number generator used to draw the signs
+        and the subsampled rows at fit time.
+        Pass an int for reproducible output across multiple function calls.
+        See :term:`Glossary <random_state>`.
+    Attributes
+    ----------
+    n_components_ : int
+        Concrete number of components computed when n_components="auto".
+    signs_ : ndarray of shape (n_features,)
+        The diagonal of ``D``, made of -1 and +1.
+    indices_ : ndarray of shape (n_components,)
+        The rows of ``H`` kept by ``S``.
+    n_features_in_ : int
+        Number of features seen during :term:`fit`.
+    See Also
+    --------
+    GaussianRandomProjection
+    References
+    ----------
+    .. [1] N. Ailon and B. Chazelle, 2006, "Approximate nearest neighbors
+           and the fast Johnson-Lindenstrauss transform".
+    .. [2] J. A. Tropp, 2011, "Improved analysis of the subsampled
+           randomized Hadamard transform".
+    """
+
+    def __init__(self, n_components="auto", *, eps=0.1, random_state=None):
+        super().__init__(
+            n_components=n_components,
+            eps=eps,
+            dense_output=True,
+            random_state=random_state,
+        )
+
+    def _fit_components(self, n_features):
+        _check_input_size(self.n_components_, n_features)
+        n_padded = 1 << (n_features - 1).bit_length()
+        if self.n_components_ > n_padded:
+            raise ValueError(
+                "HadamardRandomProjection can not project n_features=%d to "
+                "more than %d components, got %d"
+                % (n_features, n_padded, self.n_components_))
+        _set_af_seed(self.random_state)
+
+        self.signs_af_ = 1 - 2 * (af.randu(1, n_features) < 0.5).as_type(
+            af.Dtype.f32)
+        # the first n_components of a random permutation, without
+        # replacement
+        _, order = af.sort_index(af.randu(n_padded))
+        self.indices_af_ = order[:self.n_components_]
+        self.signs_ = self.signs_af_.to_ndarray().ravel()
+        self.indices_ = self.indices_af_.to_ndarray().ravel()
+
+    def _make_random_matrix(self, n_components, n_features):
+        """Materialize the fitted projection matrix.
+        The projection is applied without it, this is only meant for
+        inspection.
+        Returns
+        -------
+        components : af.Array of shape (n_features, n_components)
+            The transpose of the projection matrix.
+        """
+        return self._project(af.identity(n_features, n_features,
+                                         dtype=af.Dtype.f32))
+
+    def _upload_dtype(self):
+        return np.float32
+
+    def _project(self, X_af, transposed=False):
+        if transposed:
+            # the butterflies run along the rows
+            X_af = X_af.T
+        n_samples, n_features = X_af.dims()[0], self.signs_.shape[0]
+        n_padded = 1 << (n_features - 1).bit_length()
+        X_af = X_af.as_type(af.Dtype.f32) * af.tile(self.signs_af_, n_samples)
+        if n_padded > n_features:
+            X_af = af.join(1, X_af, af.constant(0, n_samples,
+                                                n_padded - n_features,
+                                                dtype=af.Dtype.f32))
+        X_af = _fwht(X_af)
+        return af.lookup(X_af, self.indices_af_, dim=1) * (
+            1.0 / math.sqrt(self.n_components_))
+
+    #TMP workaround for external private member modifications
+    def check_external_components_modified(self):
+        if not hasattr(self, 'signs_af_'):
+            self.signs_af_ = af.interop.from_ndarray(
+                self.signs_.astype(np.float32).reshape(1, -1))
+        if not hasattr(self, 'indices_af_'):
+            self.indices_af_ = af.interop.from_ndarray(self.indices_)
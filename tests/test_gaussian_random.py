@@ -23,6 +23,9 @@ import pytest
 
 from sklearn.random_projection import GaussianRandomProjection
 from afsklearn.random_projection import GaussianRandomProjection as afGaussianRandomProjection
+from afsklearn.random_projection import johnson_lindenstrauss_min_dim
+from afsklearn import random_projection as af_random_projection
+import arrayfire as af
 
 all_RandomProjection = [GaussianRandomProjection, afGaussianRandomProjection]
 nbench = 1
@@ -59,6 +62,27 @@ def test_random_projection_transformer_invalid_input(n_components, fit_data):
             RandomProjection(n_components=n_components).fit(fit_data)
 
 
+def test_johnson_lindenstrauss_min_dim():
+    expected = sklearn.random_projection.johnson_lindenstrauss_min_dim
+    assert johnson_lindenstrauss_min_dim(1e6, eps=0.5) == 663
+    for n_samples in [1, 10, 548, 1e6]:
+        for eps in [0.01, 0.1, 0.5, 0.99]:
+            assert (johnson_lindenstrauss_min_dim(n_samples, eps=eps) ==
+                    expected(n_samples, eps=eps))
+    assert_array_equal(johnson_lindenstrauss_min_dim(1e6, eps=[0.5, 0.1, 0.01]),
+                       [663, 11841, 1112658])
+    assert_array_equal(johnson_lindenstrauss_min_dim([1e4, 1e5, 1e6], eps=0.1),
+                       [7894, 9868, 11841])
+
+
+@pytest.mark.parametrize("n_samples, eps", [(0, 0.1), (-1, 0.1), ([10, 0], 0.1),
+                                            ([10, -5, 20], 0.1), ([-5, -1], 0.1),
+                                            (100, 0), (100, 1.1), (100, [0.1, 1])])
+def test_johnson_lindenstrauss_min_dim_invalid_input(n_samples, eps):
+    with pytest.raises(ValueError):
+        johnson_lindenstrauss_min_dim(n_samples, eps=eps)
+
+
 def test_try_to_transform_before_fit():
     for RandomProjection in all_RandomProjection:
         with pytest.raises(ValueError):
@@ -137,6 +161,97 @@ def test_correct_RandomProjection_dimensions_embedding():
             rp.transform(data[:, 1:5])
 
 
+def test_fit_transform_without_storing_components():
+    rp = afGaussianRandomProjection(n_components=20, random_state=0).fit(data)
+    projected = rp.transform(data)
+
+    rp2 = afGaussianRandomProjection(n_components=20, random_state=0,
+                                     store_components=False)
+    assert_array_almost_equal(rp2.fit_transform(data), projected)
+    assert not hasattr(rp2, "components_")
+    with pytest.raises(ValueError):
+        rp2.transform(data)
+
+    # a previous fit does not stay referenced
+    rp.set_params(store_components=False).fit_transform(data)
+    assert not hasattr(rp, "_synced_components")
+    with pytest.raises(TypeError):
+        rp2.fit_transform(sp.csr_matrix(data))
+
+
+@pytest.mark.parametrize("dtype", [np.int8, np.int32, np.complex64])
+def test_invalid_dtype(dtype):
+    rp = afGaussianRandomProjection(n_components=10, dtype=dtype)
+    with pytest.raises(ValueError, match="dtype must be one of"):
+        rp.fit(data)
+    with pytest.raises(ValueError, match="dtype must be one of"):
+        rp.set_params(store_components=False).fit_transform(data)
+
+
+def test_float16():
+    rp = afGaussianRandomProjection(n_components=20, random_state=0).fit(data)
+    rp16 = afGaussianRandomProjection(n_components=20, random_state=0,
+                                      dtype=np.float16).fit(data)
+    assert rp16.components_.shape == (20, n_features)
+    assert_array_almost_equal(rp16.components_, rp.components_, decimal=2)
+
+    projected = rp16.transform(data)
+    assert projected.dtype == np.float32
+    assert_array_almost_equal(projected, data @ rp16.components_.T, decimal=1)
+    assert_array_almost_equal(rp16.transform(data.astype(np.float16)),
+                              projected, decimal=1)
+    assert_array_almost_equal(
+        rp16.set_params(store_components=False).fit_transform(data),
+        projected, decimal=1)
+
+
+def test_single_component():
+    rp = afGaussianRandomProjection(n_components=1, random_state=0).fit(data)
+    assert rp.components_.shape == (1, n_features)
+    assert rp.transform(data).shape == (n_samples, 1)
+
+
+def test_transform_paths():
+    rp = afGaussianRandomProjection(n_components=20, random_state=0).fit(data)
+    projected = rp.transform(data)
+    assert_array_almost_equal(projected, data @ rp.components_.T)
+
+    # Fortran ordered samples are uploaded without a reorder
+    assert_array_almost_equal(rp.transform(np.asfortranarray(data)), projected)
+    assert_array_almost_equal(rp.transform(data, check_input=False),
+                              projected)
+
+    # X streamed by row panels, a few rows at a time
+    with sklearn.config_context(working_memory=0.02):
+        for X in (data, np.asfortranarray(data)):
+            assert_array_almost_equal(rp.transform(X), projected)
+
+    # the projection left on the device, and device input
+    projected_af = rp.transform(data, return_device=True)
+    assert isinstance(projected_af, af.Array)
+    assert_array_almost_equal(projected_af.to_ndarray(), projected)
+    projected_af = rp.transform(af.interop.from_ndarray(data))
+    assert isinstance(projected_af, af.Array)
+    assert_array_almost_equal(projected_af.to_ndarray(), projected)
+    with pytest.raises(ValueError):
+        rp.transform(af.interop.from_ndarray(data[:, 1:].copy()))
+
+
+def test_pinned_upload(monkeypatch):
+    rp = afGaussianRandomProjection(n_components=20, random_state=0).fit(data)
+    projected = rp.transform(data)
+
+    # go through the page-locked staging buffer whatever the input size
+    monkeypatch.setattr(af, "get_active_backend", lambda: "cuda")
+    monkeypatch.setattr(af_random_projection, "_PINNED_MIN_BYTES", 0)
+    assert_array_almost_equal(rp.transform(data), projected)
+    assert_array_almost_equal(rp.transform(np.asfortranarray(data)), projected)
+
+    # inputs above the cap are copied from pageable memory
+    monkeypatch.setattr(af_random_projection, "_PINNED_MAX_BYTES", 0)
+    assert_array_almost_equal(rp.transform(data), projected)
+
+
 def test_warning_n_components_greater_than_n_features():
     n_features = 20
     data, _ = make_sparse_random_data(5, n_features, int(n_features / 4))
@@ -0,0 +1,78 @@
+from sklearn.metrics import euclidean_distances
+from sklearn.utils._testing import assert_array_equal
+from sklearn.utils._testing import assert_array_almost_equal
+
+import numpy as np
+import scipy.linalg
+import scipy.sparse as sp
+import pytest
+
+
+from afsklearn.random_projection import HadamardRandomProjection
+
+
+def make_sparse_random_data(n_samples, n_features, n_nonzeros, random_state=None):
+    rng = np.random.RandomState(random_state)
+    data_coo = sp.coo_matrix(
+        (
+            rng.randn(n_nonzeros),
+            (
+                rng.randint(n_samples, size=n_nonzeros),
+                rng.randint(n_features, size=n_nonzeros),
+            ),
+        ),
+        shape=(n_samples, n_features),
+    )
+    return data_coo.toarray(), data_coo.tocsr()
+
+
+def test_random_projection_embedding_quality():
+    data, _ = make_sparse_random_data(8, 5000, 15000)
+    eps = 0.2
+
+    original_distances = euclidean_distances(data, squared=True)
+    original_distances = original_distances.ravel()
+    non_identical = original_distances != 0.0
+
+    # remove 0 distances to avoid division by 0
+    original_distances = original_distances[non_identical]
+
+    rp = HadamardRandomProjection(n_components="auto", eps=eps, random_state=0)
+    projected = rp.fit_transform(data)
+
+    projected_distances = euclidean_distances(projected, squared=True)
+    projected_distances = projected_distances.ravel()
+
+    # remove 0 distances to avoid division by 0
+    projected_distances = projected_distances[non_identical]
+
+    distances_ratio = projected_distances / original_distances
+
+    assert distances_ratio.max() < 1 + eps
+    assert 1 - eps < distances_ratio.min()
+
+
+@pytest.mark.parametrize("n_features", [64, 100])
+def test_projection_matches_explicit_matrix(n_features):
+    data, _ = make_sparse_random_data(10, n_features, 200, random_state=0)
+    rp = HadamardRandomProjection(n_components=20, random_state=0).fit(data)
+
+    assert rp.signs_.shape == (n_features,)
+    assert_array_equal(np.abs(rp.signs_), 1)
+    assert rp.indices_.shape == (20,)
+    assert np.unique(rp.indices_).size == 20
+
+    n_padded = 1 << (n_features - 1).bit_length()
+    hadamard = scipy.linalg.hadamard(n_padded)[:n_features]
+    components = (rp.signs_[:, None] * hadamard[:, rp.indices_]) / np.sqrt(20)
+    projected = rp.transform(data)
+    assert projected.shape == (10, 20)
+    assert_array_almost_equal(projected, data @ components, decimal=4)
+
+    # fit transform with same random seed will lead to the same results
+    rp2 = HadamardRandomProjection(n_components=20, random_state=0)
+    assert_array_equal(projected, rp2.fit_transform(data))
+
+    # Try to transform with an input X of size different from fitted.
+    with pytest.raises(ValueError):
+        rp.transform(data[:, 1:5])
@@ -1,4 +1,8 @@
+import numpy as np
+from sklearn.preprocessing import OneHotEncoder
+
 from afsklearn.patcher import Patcher
+from afsklearn.preprocessing._encoders import OneHotEncoder as afOneHotEncoder
 
 from . import measure_time
 
@@ -22,6 +26,125 @@ def test_afsklearn() -> None:
     Patcher.rollback("one_hot_encoder")
 
 
+def test_integer_input_matches_sklearn() -> None:
+    rng = np.random.RandomState(0)
+    X = rng.randint(-2, 5, size=(50, 4))
+    X_unknown = rng.randint(-4, 7, size=(20, 4))
+
+    enc = OneHotEncoder(handle_unknown='ignore').fit(X)
+    af_enc = afOneHotEncoder(handle_unknown='ignore').fit(X)
+    for data in (X, X_unknown):
+        np.testing.assert_array_equal(af_enc.transform(data).toarray(),
+                                      enc.transform(data).toarray())
+
+
+def test_integer_input_with_drop_matches_sklearn() -> None:
+    rng = np.random.RandomState(0)
+    X = rng.randint(0, 4, size=(50, 3))
+    X[:, 2] *= 1000
+
+    for drop in ('first', 'if_binary', [3, 1, 2000]):
+        enc = OneHotEncoder(drop=drop).fit(X)
+        af_enc = afOneHotEncoder(drop=drop).fit(X)
+        assert af_enc._int_lut_ is not None
+        np.testing.assert_array_equal(af_enc.transform(X).toarray(),
+                                      enc.transform(X).toarray())
+
+    # unknown categories still raise with handle_unknown='error'
+    X_unknown = X.copy()
+    X_unknown[0, 0] = 7
+    try:
+        af_enc.transform(X_unknown)
+    except ValueError as e:
+        assert "unknown categories" in str(e)
+    else:
+        raise AssertionError("unknown categories were encoded")
+
+
+def test_integer_lookup_table_size() -> None:
+    # few categories over a wide range are searched instead of looked up
+    rng = np.random.RandomState(0)
+    X = rng.randint(0, 60000, size=(100, 30))
+    af_enc = afOneHotEncoder().fit(X)
+    assert af_enc._int_lut_ is None
+    np.testing.assert_array_equal(af_enc.transform(X).toarray(),
+                                  OneHotEncoder().fit_transform(X).toarray())
+
+
+def test_duplicated_integer_categories() -> None:
+    X = np.array([[1], [2], [2]])
+    categories = [[1, 2, 2]]
+    enc = OneHotEncoder(categories=categories).fit(X)
+    af_enc = afOneHotEncoder(categories=categories).fit(X)
+    expected = enc.transform(X).toarray()
+    np.testing.assert_array_equal(af_enc.transform(X).toarray(), expected)
+    np.testing.assert_array_equal(
+        af_enc.transform(X.astype(float)).toarray(), expected)
+
+
+def _assert_same_encoding(enc, af_enc, X) -> None:
+    assert len(af_enc.categories_) == len(enc.categories_)
+    for af_cats, cats in zip(af_enc.categories_, enc.categories_):
+        # as strings, nan in an object array is not equal to itself
+        np.testing.assert_array_equal(af_cats.astype(str), cats.astype(str))
+    X_out = enc.transform(X)
+    af_X_out = af_enc.transform(X)
+    if enc.sparse:
+        X_out, af_X_out = X_out.toarray(), af_X_out.toarray()
+    np.testing.assert_array_equal(af_X_out, X_out)
+
+
+def test_mixed_columns_match_sklearn() -> None:
+    X = np.array([['a', 1.0, 'x'],
+                  ['b', np.nan, 'y'],
+                  ['a', 2.0, np.nan],
+                  ['c', 1.0, 'x']], dtype=object)
+    enc = OneHotEncoder().fit(X)
+    af_enc = afOneHotEncoder().fit(X)
+    _assert_same_encoding(enc, af_enc, X)
+
+    X_unknown = np.array([['d', 3.0, 'z'], ['a', np.nan, np.nan]],
+                         dtype=object)
+    enc = OneHotEncoder(handle_unknown='ignore').fit(X)
+    af_enc = afOneHotEncoder(handle_unknown='ignore').fit(X)
+    _assert_same_encoding(enc, af_enc, X_unknown)
+
+
+def test_drop_matches_sklearn() -> None:
+    X = np.array([['a', 1.0, 0],
+                  ['b', np.nan, 1],
+                  ['a', 2.0, 1],
+                  ['c', 1.0, 0]], dtype=object)
+    X_float = np.array([[0.0, 1.0], [np.nan, 2.0], [1.0, 1.0]])
+    for data, drop in ((X, 'first'), (X, 'if_binary'),
+                       (X, ['b', 2.0, 0]), (X, ['c', np.nan, 1]),
+                       (X_float, 'first'), (X_float, [np.nan, 2.0])):
+        for sparse in (True, False):
+            enc = OneHotEncoder(drop=drop, sparse=sparse).fit(data)
+            af_enc = afOneHotEncoder(drop=drop, sparse=sparse).fit(data)
+            np.testing.assert_array_equal(af_enc.drop_idx_.astype(float),
+                                          enc.drop_idx_.astype(float))
+            _assert_same_encoding(enc, af_enc, data)
+
+
+def test_inverse_transform_matches_sklearn() -> None:
+    X = np.array([['a', 1.0, 0],
+                  ['b', np.nan, 1],
+                  ['a', 2.0, 1],
+                  ['c', 1.0, 0]], dtype=object)
+    for drop in (None, 'first'):
+        for sparse in (True, False):
+            enc = OneHotEncoder(drop=drop, sparse=sparse).fit(X)
+            af_enc = afOneHotEncoder(drop=drop, sparse=sparse).fit(X)
+            X_out = enc.transform(X)
+            # CSR or dense, as transform returned it
+            X_inv = af_enc.inverse_transform(X_out)
+            np.testing.assert_array_equal(X_inv.astype(str),
+                                          enc.inverse_transform(X_out)
+                                          .astype(str))
+            np.testing.assert_array_equal(X_inv.astype(str), X.astype(str))
+
+
 if __name__ == "__main__":
     test_afsklearn()
     test_sklearn()
@@ -0,0 +1,143 @@
+from sklearn.metrics import euclidean_distances
+from sklearn.utils._testing import assert_array_equal
+from sklearn.utils._testing import assert_array_almost_equal
+
+import numpy as np
+import scipy.sparse as sp
+import pytest
+
+
+from sklearn.random_projection import SparseRandomProjection
+from afsklearn.random_projection import SparseRandomProjection as afSparseRandomProjection
+
+all_RandomProjection = [SparseRandomProjection, afSparseRandomProjection]
+
+
+def make_sparse_random_data(n_samples, n_features, n_nonzeros, random_state=None):
+    rng = np.random.RandomState(random_state)
+    data_coo = sp.coo_matrix(
+        (
+            rng.randn(n_nonzeros),
+            (
+                rng.randint(n_samples, size=n_nonzeros),
+                rng.randint(n_features, size=n_nonzeros),
+            ),
+        ),
+        shape=(n_samples, n_features),
+    )
+    return data_coo.toarray(), data_coo.tocsr()
+
+
+def densify(matrix):
+    if not sp.issparse(matrix):
+        return matrix
+    else:
+        return matrix.toarray()
+
+
+n_samples, n_features = (10, 1000)
+n_nonzeros = int(n_samples * n_features / 100.0)
+data, data_csr = make_sparse_random_data(n_samples, n_features, n_nonzeros)
+
+
+@pytest.mark.parametrize("density", [1.1, 0, -0.1])
+def test_sparse_random_projection_transformer_invalid_density(density):
+    for RandomProjection in all_RandomProjection:
+        with pytest.raises(ValueError):
+            RandomProjection(density=density).fit(data)
+
+
+def test_random_projection_embedding_quality():
+    data, _ = make_sparse_random_data(8, 5000, 15000)
+    eps = 0.2
+
+    original_distances = euclidean_distances(data, squared=True)
+    original_distances = original_distances.ravel()
+    non_identical = original_distances != 0.0
+
+    # remove 0 distances to avoid division by 0
+    original_distances = original_distances[non_identical]
+
+    for RandomProjection in all_RandomProjection:
+        rp = RandomProjection(n_components="auto", eps=eps, random_state=0)
+        projected = rp.fit_transform(data)
+
+        projected_distances = euclidean_distances(projected, squared=True)
+        projected_distances = projected_distances.ravel()
+
+        # remove 0 distances to avoid division by 0
+        projected_distances = projected_distances[non_identical]
+
+        distances_ratio = projected_distances / original_distances
+
+        assert distances_ratio.max() < 1 + eps
+        assert 1 - eps < distances_ratio.min()
+
+
+@pytest.mark.parametrize("n_features", [1000, 20000])
+def test_correct_RandomProjection_dimensions_embedding(n_features):
+    data, _ = make_sparse_random_data(n_samples, n_features, n_nonzeros)
+    for RandomProjection in all_RandomProjection:
+        rp = RandomProjection(n_components="auto", random_state=0, eps=0.5).fit(data)
+
+        assert rp.n_components_ == 110
+        assert rp.density_ == pytest.approx(1 / np.sqrt(n_features))
+        assert rp.components_.shape == (110, n_features)
+
+        # the density of the matrix matches the requested one
+        components = densify(rp.components_)
+        assert np.count_nonzero(components) / components.size == pytest.approx(
+            rp.density_, rel=0.1)
+        values = np.unique(np.abs(components[components != 0]))
+        assert_array_almost_equal(
+            values, [np.sqrt(1 / rp.density_) / np.sqrt(110)])
+
+        projected_1 = rp.transform(data)
+        assert projected_1.shape == (n_samples, 110)
+        assert_array_almost_equal(densify(projected_1), data @ components.T,
+                                  decimal=4)
+
+        # fit transform with same random seed will lead to the same results
+        rp2 = RandomProjection(random_state=0, eps=0.5)
+        projected_3 = rp2.fit_transform(data)
+        assert_array_equal(densify(projected_1), densify(projected_3))
+
+        # Try to transform with an input X of size different from fitted.
+        with pytest.raises(ValueError):
+            rp.transform(data[:, 1:5])
+
+
+@pytest.mark.parametrize("density", ["auto", 0.005])
+def test_sparse_components_and_input(density):
+    rp = afSparseRandomProjection(n_components=20, density=density,
+                                  random_state=0).fit(data)
+    # the components stay sparse whatever the layout of the device copy
+    assert sp.isspmatrix_csr(rp.components_)
+    components = rp.components_.toarray()
+
+    projected = rp.transform(data_csr)
+    assert sp.issparse(projected)
+    assert_array_almost_equal(projected.toarray(), data @ components.T,
+                              decimal=4)
+    assert_array_almost_equal(rp.transform(data_csr.tocsc()).toarray(),
+                              projected.toarray())
+
+    rp.set_params(dense_output=True)
+    assert_array_almost_equal(rp.transform(data_csr), projected.toarray())
+
+    # the device copy is rebuilt from the sparse components
+    del rp.components_af_
+    assert_array_almost_equal(rp.transform(data), projected.toarray(),
+                              decimal=4)
+
+
+def test_sparse_components_match_sklearn():
+    # below 1% density the nonzero components are drawn as scikit-learn does
+    rp = SparseRandomProjection(n_components=20, density=0.005,
+                                random_state=0).fit(data)
+    af_rp = afSparseRandomProjection(n_components=20, density=0.005,
+                                     random_state=0).fit(data)
+    assert_array_almost_equal(af_rp.components_.toarray(),
+                              rp.components_.toarray())
+    assert_array_almost_equal(af_rp.transform(data), rp.transform(data),
+                              decimal=4)